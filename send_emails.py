@@ -23,8 +23,11 @@ import json
 import os
 import re
 import sys
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import partial
+from typing import TextIO
 
 from dotenv import load_dotenv
 
@@ -35,6 +38,8 @@ from src.extensions.jinja.jinja_environment_extended import (
     JinjaFileSystemEnvironmentExtended,
 )
 from src.packages.pymsgraph_mail.pymsgraph_mail import (
+    MSGRAPH_MAX_BATCH_SIZE,
+    BatchingSendMail,
     BodyType,
     EmailImportance,
     SimpleSendMail,
@@ -117,6 +122,14 @@ parser.add_argument(
     default=10,
     help="Maximum number of concurrent threads to use for sending emails concurrently. Defaults to 10. WARNING: I RECOMMEND NOT INCREASING THE MAX THREADS!",
 )
+parser.add_argument(
+    "--no-render-cache",
+    "--nrc",
+    action="store_true",
+    help="Render the template fresh for every row, instead of reusing the rendered template for rows with the same "
+    + "data. Use this if the template's output can change between renders (e.g. it uses the random filter, a cycler "
+    + "or the current time).",
+)
 # Parse the provided argumentsw
 args = parser.parse_args()
 
@@ -153,9 +166,58 @@ logger.add(
 logger.debug(f"Successfully configured logging to file {logger._core.handlers.get(2)._name} ✅")
 logger.info("Logging handlers initialized ✅")
 
+
 #############################################
 # Perform some early on validation on provided configuration
 #############################################
+def validate_args(args: argparse.Namespace) -> None:
+    """
+    Validate the provided command line arguments. These checks are cheap, so they are run before the .env file is
+    loaded or the email client is initialized (which retrieves an OAuth token from Microsoft), so that a malformed
+    invocation fails immediately.
+
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :return: None
+    :rtype: None
+    """
+    # Validate an email subject is provided
+    if args.subject is None or args.subject == "":
+        logger.critical("No email subject provided. Please provide a subject and try again.")
+        raise Exception(
+            "No email subject provided. Please provide a subject using parameter --subject or --s and try again."
+        )
+
+    # Validate the sending account's email address and name are provided
+    if args.email is None or args.email == "":
+        logger.critical("No source email address provided. Please provide one and try again.")
+        raise Exception(
+            "No source email address provided. Please provide one using parameter --email or --e and try again."
+        )
+    if args.name is None or args.name == "":
+        logger.critical("No source email name provided. Please provide one and try again.")
+        raise Exception(
+            "No source email name provided. Please provide one using parameter --name or --n and try again."
+        )
+
+    # Validate template and CSV paths are provided. Whether they exist is checked when they are opened.
+    if args.template_path is None or args.template_path == "":
+        logger.critical("No template path provided. Please provide a template path and try again.")
+        raise Exception(
+            "No template path provided. Please provide one using parameter --template_path or --t and try again."
+        )
+    if not args.template_path.lower().endswith((".html", ".htm")):
+        logger.warning(f"Template path '{args.template_path}' does not have a .html extension. Continuing anyway.⚠️")
+
+    if args.csv_path is None or args.csv_path == "":
+        logger.critical("No CSV path provided. Please provide a CSV path and try again.")
+        raise Exception("No CSV path provided. Please provide one using parameter --csv_path or --c and try again.")
+    if not args.csv_path.lower().endswith(".csv"):
+        logger.warning(f"CSV path '{args.csv_path}' does not have a .csv extension. Continuing anyway.⚠️")
+
+
+validate_args(args)
+
 # Load environment variables from .env file, validating the file loaded properly
 env_loaded: bool = load_dotenv(args.env_file_name, override=True)
 logger.debug(f"Successfully loaded env file {args.env_file_name}? {env_loaded}")
@@ -167,23 +229,6 @@ if not env_loaded:
         "Failed to load environment from '.env' file. Please make sure a .env file exists in the project root."
     )
 
-# Validate an email subject is provided
-if args.subject is None or args.subject == "":
-    logger.critical("No email subject provided. Please provide a subject and try again.")
-    raise Exception(
-        "No email subject provided. Please provide a subject using parameter --subject or --s and try again."
-    )
-
-# Validate template path exists!
-if not os.path.exists(args.template_path):
-    logger.critical(f"Template path '{args.template_path}' does not exist. Please check path and try again.")
-    raise FileNotFoundError(f"Template path '{args.template_path}' does not exist. Please check path and try again.")
-
-# Validate CSV path exists!
-if not os.path.exists(args.csv_path):
-    logger.critical(f"CSV path '{args.csv_path}' does not exist. Please check path and try again.")
-    raise FileNotFoundError(f"CSV path '{args.csv_path}' does not exist. Please check path and try again.")
-
 #######################################################
 # Config email client
 #######################################################
@@ -204,66 +249,86 @@ for key, value in ms_creds_map.items():
             f"Failed to load {key} from environment. Please make sure it is set in the .env file and not empty."
         )
 
-logger.debug("Initializing SimpleSendMail class ⏳")
+#######################################################
+# Open the template and CSV
+#######################################################
+# Read the template before the email client is initialized, so that a missing template does not cost an OAuth token
+# request. The source is handed to the Jinja environment, so the template is only read from disk once.
+logger.debug(f"Attempting to read template file at path: {args.template_path}")
 try:
-    simple_mail: SimpleSendMail = SimpleSendMail(
+    with open(args.template_path, mode="r", encoding="utf-8") as template_file:
+        template_source: str = template_file.read()
+except (OSError, UnicodeDecodeError) as err:
+    logger.critical(f"Could not read template path '{args.template_path}' ({err}). Please check path and try again.")
+    raise
+logger.debug(f"Successfully read template file at path: {args.template_path} ✅")
+
+# Open the CSV now, so that a missing CSV is also caught before the email client is initialized. It is opened after the
+# .env file and credentials are checked, so that it does not need closing if they are missing. It is closed if
+# initializing the email client or loading the Jinja environment fails, otherwise when all of its rows have been read.
+logger.debug(f"Attempting to open CSV file at path: {args.csv_path}")
+try:
+    csv_file: TextIO = open(args.csv_path, mode="r", encoding="utf-8")
+except OSError as err:
+    logger.critical(f"Could not open CSV path '{args.csv_path}' ({err}). Please check path and try again.")
+    raise
+logger.debug(f"Successfully opened CSV file at path: {args.csv_path} ✅")
+
+#######################################################
+# Initialize email client and load Jinja Environment
+#######################################################
+# Initializing SimpleSendMail retrieves an OAuth token from Microsoft (a network round trip), while loading the Jinja
+# environment compiles the template. Neither depends on the other, so both are done concurrently.
+with ThreadPoolExecutor(max_workers=2) as startup_executor:
+    logger.debug("Initializing SimpleSendMail class ⏳")
+    simple_mail_future: Future = startup_executor.submit(
+        SimpleSendMail,
         tenant_id=ms_creds_map.get("msgraph_tenant_id"),
         client_id=ms_creds_map.get("msgraph_client_id"),
         client_secret=ms_creds_map.get("msgraph_client_secret"),
         source_mail_name=args.name,
         source_mail_address=args.email,
+        max_connections=args.max_concurrent_threads,
+    )
+    # Create instance of custom JinjaFileSystemEnvironmentExtended class
+    logger.debug("Loading Jinja2 Environment Extended ⏳")
+    jinja_ext_env_future: Future = startup_executor.submit(
+        JinjaFileSystemEnvironmentExtended,
+        template_file_path=args.template_path,
+        template_source=template_source,
+        # A cache size of 0 disables memoizing rendered templates
+        render_cache_size=0 if args.no_render_cache else 1024,
     )
+
+try:
+    simple_mail: SimpleSendMail = simple_mail_future.result()
     logger.info("Initalized email client ✅")
 except Exception as err:
+    csv_file.close()
     logger.exception(err)
     logger.critical("Failed to initialize email client‼📛. Exiting.")
     raise Exception("Failed to initialize email client‼📛. Exiting.")
 
-#######################################################
-# Load Jinja Environment
-#######################################################
-# Create instance of custom JinjaFileSystemEnvironmentExtended class
 try:
-    jinja_ext_env: JinjaFileSystemEnvironmentExtended = JinjaFileSystemEnvironmentExtended(
-        template_file_path=args.template_path
-    )
+    jinja_ext_env: JinjaFileSystemEnvironmentExtended = jinja_ext_env_future.result()
     logger.info("Loaded Jinja2 Environment Extended ✅")
+except FileNotFoundError as err:
+    csv_file.close()
+    logger.critical(f"{err} Please check path and try again.")
+    raise
 except Exception as err:
+    csv_file.close()
     logger.exception(err)
     logger.critical("Failed to load Jinja2 Environment Extended📛. Exiting.")
     raise Exception("Failed to load Jinja2 Environment Extended📛. See previously logged exception.")
 
-#######################################################
-# Load provided CSV into list of dictionaries
-#######################################################
-csv_data: list[dict[str, str]] = []
-emails_must_match_regex: str = os.getenv("EMAILS_MUST_MATCH_REGEX")
-
-logger.debug(f"Attempting to open CSV file at path: {args.csv_path}")
-try:
-    with open(args.csv_path, mode="r", encoding="utf-8") as csv_file:
-        logger.debug(f"Successfully opened CSV file at path: {args.csv_path} ✅")
-        csv_dict_reader: csv.DictReader = csv.DictReader(csv_file)
-        logger.debug("Successfully created DictReader object from CSV file object.✅")
-        for i, row in enumerate(csv_dict_reader):
-            if (
-                emails_must_match_regex is not None
-                and emails_must_match_regex != ""
-                and not re.match(pattern=emails_must_match_regex, string=row["email_address"])
-            ):
-                logger.warning(
-                    f"Row #{i}-> email_address {row['email_address']} does not match regex {emails_must_match_regex}. Skipping row!"
-                )
-                logger.warning(f"Skipping row #{i}: {row}")
-                continue
-            csv_data.append(row)
-            logger.trace(f"Loadied Row #{i}: {row}")
-    logger.info(f"Loaded {len(csv_data)} rows from CSV ✅")
-except Exception as err:
-    logger.exception(err)
-    err_str: str = "An unhandled error was raised while reading data from CSV file📛. Exiting..."
-    logger.critical(err_str)
-    raise Exception(err_str)
+# Emails are buffered and sent to MS Graph in JSON batches of up to 20, rather than one request per email
+batch_mail: BatchingSendMail = BatchingSendMail(
+    simple_mail=simple_mail,
+    max_batch_size=MSGRAPH_MAX_BATCH_SIZE,
+    max_wait=0.01,
+)
+logger.debug("Initalized batching email client ✅")
 
 
 #######################################################
@@ -272,7 +337,11 @@ except Exception as err:
 # Ensures that any exception raised within this function (which will be running in a separate thread) is propagated
 # back to the loguru logger
 @logger.catch()
-def send_email(row: dict[str, str], is_dry_run: bool = False) -> None | dict:
+def send_email(
+    row: dict[str, str],
+    is_dry_run: bool = False,
+    _render_row: Callable[[dict[str, str]], str] = jinja_ext_env.render_row,
+) -> Future:
     """
     Send an email to a specified recipient based on the provided template and data.
 
@@ -281,82 +350,245 @@ def send_email(row: dict[str, str], is_dry_run: bool = False) -> None | dict:
     process. Optionally, it can run in "dry-run" mode, in which it renders the template
     but skips the email-sending process.
 
+    The email is added to the next batch to be sent, and this function returns without
+    waiting for the batch to be sent. This way, threads are only busy rendering templates
+    and sending batches, not waiting on individual emails.
+
     :param row: Dictionary containing the data for rendering the email template and
         email address of the recipient.
     :type row: dict[str, str]
     :param is_dry_run: If True, the function will render the email template but will not
         actually send the email.
     :type is_dry_run: bool
-    :return: Returns a dictionary containing failure information if an error occurs,
-        otherwise returns None.
-    :rtype: None | dict
+    :param _render_row: Not meant to be passed. jinja_ext_env.render_row is bound here once when the function is
+        defined, instead of being looked up each time the function is called.
+    :type _render_row: Callable[[dict[str, str]], str]
+    :return: Returns a Future which resolves to a dictionary containing failure information
+        if an error occurs, otherwise resolves to None.
+    :rtype: Future
     """
     if is_dry_run:
         logger.warning("⚠️DRY RUN MODE ENABLED. Will render template but not send the email!⚠️")
     logger.info(f"Attempting to send mail for {row['email_address']}")
-    logger.debug(f"Rendering template for {row['email_address']}")
+    # Log calls made for every row pass their arguments separately (rather than as f-strings), so loguru only
+    # formats the message if it is actually going to be emitted at the configured log level.
+    logger.debug("Rendering template for {}", row["email_address"])
 
     # This function call will render the template with the row's data. Passing it 'row' gives Jinja2 access to all
-    # the data loaded from that row of the CSV
-    user_rendered_template: str = jinja_ext_env.template.render(row)
-
-    logger.debug(f"Rendered template for {row['email_address']}")
-
-    logger.debug(f"Attempting to send mail to {row['email_address']}")
-    if not is_dry_run:
-        try:
-            simple_mail.send_mail(
-                subject=args.subject,
-                recipient_emails=row["email_address"],
-                body_content=user_rendered_template,
-                body_type=BodyType.HTML,
-                importance=EmailImportance.High,
-            )
-            logger.info(f"Successfully sent mail to {row['email_address']}✅")
-        except Exception as err:
-            logger.exception(err)
-            logger.error(f"Failed to send mail to {row['email_address']}⚠️. Logging error information and continuing.")
-            failure_information: dict[str, str] = {
-                "mail": row["email_address"],
-                "row": json.dumps(row),
-                "error": str(err),
-                "html_content": user_rendered_template,
-            }
-            return failure_information
-    else:
+    # the data loaded from that row of the CSV. Rows with the same values for the template's variables reuse the
+    # previously rendered template.
+    # The template is rendered to a complete string, rather than streamed with Template.generate(), as MS Graph expects
+    # the email body as a single string within the JSON payload of the sendMail request.
+    user_rendered_template: str = _render_row(row)
+
+    logger.debug("Rendered template for {}", row["email_address"])
+
+    logger.debug("Attempting to send mail to {}", row["email_address"])
+    result_future: Future = Future()
+    if is_dry_run:
         logger.info(f"Did NOT send mail to {row['email_address']} because --dry-run was provided.")
-    return None
+        result_future.set_result(None)
+        return result_future
 
+    def on_mail_sent(mail_future: Future) -> None:
+        # Called by whichever thread sends the batch the email was added to
+        err: BaseException | None = mail_future.exception()
+        if err is None:
+            logger.info(f"Successfully sent mail to {row['email_address']}✅")
+            result_future.set_result(None)
+            return
+        logger.opt(exception=err).error(err)
+        logger.error(f"Failed to send mail to {row['email_address']}⚠️. Logging error information and continuing.")
+        # The row is converted to JSON when the failure is written to the failure CSV, not here
+        failure_information: dict[str, str | dict[str, str]] = {
+            "mail": row["email_address"],
+            "row": row,
+            "error": str(err),
+            "html_content": user_rendered_template,
+        }
+        result_future.set_result(failure_information)
+
+    # Add the email to the next batch to be sent
+    batch_mail.send_mail(
+        subject=args.subject,
+        recipient_emails=row["email_address"],
+        body_content=user_rendered_template,
+        body_type=BodyType.HTML,
+        importance=EmailImportance.High,
+    ).add_done_callback(on_mail_sent)
+    return result_future
 
-#############################################
-# Use ThreadPoolExecutor to batch send N emails at a time
-# (where N is --max-concurrent-threads -> default is 10
-#############################################
-logger.debug(f"Creating ThreadPoolExecutor with max_workers={args.max_concurrent_threads}")
-with ThreadPoolExecutor(max_workers=args.max_concurrent_threads) as executor:
-    # This will call the send_email function against every row of data, 10 at a time. It creates 10 threads at a time
-    # to concurrent send 10 emails at a time. We also have to create a list of boolean values representing if dry
-    # run is enabled that is N items long, where N is equal to the number of rows of data. This is passed to the
-    # is_dry_run parameter of the send_email function.
-    #
-    # Finally, the result of each function call is saved into a list, results.
-    results = list(executor.map(send_email, csv_data, [args.dry_run] * len(csv_data)))
-
-# The send_email function will return None unless it failed to send the email, which instead it returns a small
-# dictionary containing failure details. So, if we do list comprehension and create a new list, where the only
-# elements are elements of the results list that are not None, we get a list of dictionaries containing failure details.
-failures: list[dict] = [result for result in results if result is not None]
-
-if len(failures) > 0:
-    filename: str = f"./email_failures_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.csv"
-    logger.error(
-        f"Failed to send emails to {len(failures)} out of {len(csv_data)} users📛‼️. This data will be exported to {filename}"
-    )
-    with open(filename, mode="w", encoding="utf-8") as failure_file:
-        failure_writer = csv.DictWriter(failure_file, fieldnames=failures[0].keys())
-        failure_writer.writeheader()
-        for failure in failures:
-            failure_writer.writerow(failure)
-    logger.info(f"Exported {len(failures)} rows of failure information to {filename}")
+
+#######################################################
+# Stream rows from the provided CSV into the ThreadPoolExecutor
+#######################################################
+emails_must_match_regex: str = os.getenv("EMAILS_MUST_MATCH_REGEX")
+# Compile the regex once up front rather than having re.match look it up for every row of the CSV
+email_re: re.Pattern | None = re.compile(emails_must_match_regex) if emails_must_match_regex else None
+# Number of rows handed off to send_email, incremented by load_csv_rows as rows are read from the CSV
+loaded_row_count: int = 0
+
+
+def load_csv_rows(csv_reader: Iterator[list[str]]) -> Iterator[dict[str, str]]:
+    """
+    Lazily yield each row of the CSV as a dictionary keyed by the CSV's header, skipping any row whose email_address
+    does not match EMAILS_MUST_MATCH_REGEX (if it was provided). The email_address is checked before the row is
+    converted into a dictionary, so no dictionary is built for skipped rows. Rows with fewer fields than the header
+    have the missing fields set to None, as csv.DictReader does. Rows without an email_address are skipped.
+
+    :param csv_reader: csv.reader created from the opened CSV file object.
+    :type csv_reader: Iterator[list[str]]
+    :return: Generator yielding the rows that should be sent an email.
+    :rtype: Iterator[dict[str, str]]
+    """
+    global loaded_row_count
+    header: list[str] | None = next(csv_reader, None)
+    if header is None:
+        logger.warning(f"CSV file at path {args.csv_path} is empty. No emails will be sent.⚠️")
+        return
+    if "email_address" not in header:
+        logger.critical(f"CSV file at path {args.csv_path} does not contain the column email_address.")
+        raise ValueError(f"CSV file at path {args.csv_path} does not contain the column email_address.")
+    email_idx: int = header.index("email_address")
+
+    for i, row in enumerate(csv_reader):
+        # Skip blank lines, as csv.DictReader does
+        if len(row) == 0:
+            continue
+        if len(row) < len(header):
+            logger.warning(f"Row #{i} has fewer fields than the CSV header. Setting the missing fields to None.⚠️")
+            row += [None] * (len(header) - len(row))
+        if row[email_idx] is None or row[email_idx] == "":
+            logger.warning(f"Row #{i} has no email_address. Skipping row!")
+            logger.warning(f"Skipping row #{i}: {row}")
+            continue
+        if email_re is not None and not email_re.match(row[email_idx]):
+            logger.warning(
+                f"Row #{i}-> email_address {row[email_idx]} does not match regex {emails_must_match_regex}. Skipping row!"
+            )
+            logger.warning(f"Skipping row #{i}: {row}")
+            continue
+        row_dict: dict[str, str] = dict(zip(header, row))
+        loaded_row_count += 1
+        # Converting the whole row to a string is deferred until (and unless) the trace message is emitted
+        logger.opt(lazy=True).trace("Loaded Row #{}: {}", lambda: i, lambda: row_dict)
+        yield row_dict
+
+
+def send_emails_bounded(
+    executor: ThreadPoolExecutor,
+    send_email_worker: Callable[[dict[str, str]], Future],
+    rows: Iterator[dict[str, str]],
+    max_in_flight: int,
+) -> Iterator[dict | None]:
+    """
+    Submit a send_email_worker call to the executor for each row, keeping at most max_in_flight emails in flight
+    (submitted but not yet sent) at once. The next row is only pulled from rows once an email in flight is sent, so
+    rows are read from the CSV as they are needed rather than all up front (as ThreadPoolExecutor.map would).
+
+    :param executor: ThreadPoolExecutor to run send_email_worker in.
+    :type executor: ThreadPoolExecutor
+    :param send_email_worker: send_email, with is_dry_run bound.
+    :type send_email_worker: Callable[[dict[str, str]], Future]
+    :param rows: Rows to send an email to.
+    :type rows: Iterator[dict[str, str]]
+    :param max_in_flight: Maximum number of emails in flight at once.
+    :type max_in_flight: int
+    :return: Generator yielding the result of each email as soon as it is sent (or fails). Each result is None unless
+        the email failed to send, in which case it is a dictionary containing failure details.
+    :rtype: Iterator[dict | None]
+    """
+    in_flight: set[Future] = set()
+
+    def collect_completed() -> Iterator[dict | None]:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.discard(future)
+            result: Future | dict | None = future.result()
+            if isinstance(result, Future):
+                # send_email has rendered the email and added it to a batch, so now wait on the email being sent
+                in_flight.add(result)
+            else:
+                # Either the email was sent (or failed), or send_email raised an exception and returned None
+                yield result
+
+    for row in rows:
+        while len(in_flight) >= max_in_flight:
+            yield from collect_completed()
+        in_flight.add(executor.submit(send_email_worker, row))
+    while len(in_flight) > 0:
+        yield from collect_completed()
+
+
+# Failure information is written to this file as emails fail. The file is only created once the first email fails.
+failure_filename: str = f"./email_failures_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.csv"
+failure_fieldnames: list[str] = ["mail", "row", "error", "html_content"]
+failure_file: TextIO | None = None
+failure_count: int = 0
+
+try:
+    with csv_file:
+        csv_reader: Iterator[list[str]] = csv.reader(csv_file)
+        logger.debug("Successfully created reader object from CSV file object.✅")
+
+        #############################################
+        # Use ThreadPoolExecutor to batch send N emails at a time
+        # (where N is --max-concurrent-threads -> default is 10
+        #############################################
+        logger.debug(f"Creating ThreadPoolExecutor with max_workers={args.max_concurrent_threads}")
+        with ThreadPoolExecutor(max_workers=args.max_concurrent_threads) as executor:
+            # This will call the send_email function against every row of data, 10 at a time. Binding is_dry_run with
+            # partial means we don't need to build a second list of booleans that is as long as the CSV.
+            send_email_worker = partial(send_email, is_dry_run=args.dry_run)
+            # Rows are pulled from the CSV by the load_csv_rows generator only as emails in flight are sent. Enough
+            # emails are kept in flight for every thread to be sending a full batch at once.
+            # Failures are collected while rows are still being submitted (send_emails_bounded waits on whichever
+            # email in flight finishes first), not only once every row has been submitted.
+            try:
+                for failure in send_emails_bounded(
+                    executor=executor,
+                    send_email_worker=send_email_worker,
+                    rows=load_csv_rows(csv_reader),
+                    max_in_flight=args.max_concurrent_threads * MSGRAPH_MAX_BATCH_SIZE,
+                ):
+                    # Each result is None unless its email failed to send, in which case it is a small dictionary
+                    # containing failure details. Failures are written to the failure CSV as soon as they occur, so
+                    # they are not lost if the script is stopped part way through.
+                    if failure is None:
+                        continue
+                    if failure_file is None:
+                        logger.error(
+                            f"Failed to send an email📛‼️. Failure information will be exported to {failure_filename}"
+                        )
+                        failure_file = open(failure_filename, mode="w", encoding="utf-8")
+                        failure_writer = csv.DictWriter(failure_file, fieldnames=failure_fieldnames)
+                        failure_writer.writeheader()
+                    failure_writer.writerow({**failure, "row": json.dumps(failure["row"])})
+                    failure_file.flush()
+                    failure_count += 1
+            except KeyboardInterrupt:
+                # Cancel the rows not yet started, rather than waiting for the executor to finish every queued row
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    # Send any emails still waiting in a partially filled batch
+    batch_mail.close()
+    logger.info(f"Processed {loaded_row_count} rows from CSV ✅")
+except KeyboardInterrupt:
+    logger.warning(f"Interrupted after processing {loaded_row_count} rows from CSV⚠️. Exiting...")
+    if failure_count > 0:
+        logger.info(f"Exported {failure_count} rows of failure information to {failure_filename} before interruption")
+    raise
+except Exception as err:
+    logger.exception(err)
+    err_str: str = "An unhandled error was raised while reading data from CSV file📛. Exiting..."
+    logger.critical(err_str)
+    raise Exception(err_str)
+finally:
+    if failure_file is not None:
+        failure_file.close()
+
+if failure_count > 0:
+    logger.error(f"Failed to send emails to {failure_count} out of {loaded_row_count} users📛‼️.")
+    logger.info(f"Exported {failure_count} rows of failure information to {failure_filename}")
 else:
     logger.info("All emails sent successfully!✅")
@@ -10,16 +10,48 @@
 @License :   MIT License
 @Desc    :   None
 """
-from jinja2 import Environment, FileSystemLoader, Template
+import os
+from functools import lru_cache
+
+from jinja2 import (
+    ChoiceLoader,
+    DictLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    TemplateNotFound,
+    meta,
+)
 from loguru import logger
 
 
 class JinjaFileSystemEnvironmentExtended(Environment):
-    def __init__(self, template_file_path: str):
+    def __init__(
+        self,
+        template_file_path: str,
+        template_source: str | None = None,
+        bytecode_cache_dir: str | None = None,
+        render_cache_size: int = 1024,
+    ):
         """
-        Initialize the extended Jinja2 Environment, which uses a FileSystemLoader.
+        Initialize the extended Jinja2 Environment, which uses a FileSystemLoader. Compiled templates are written to
+        an on-disk bytecode cache in the user's cache directory, so subsequent runs (from any working directory) skip
+        parsing and compiling the template source. The bytecode cache is best-effort: if its directory cannot be created
+        or written to, templates are compiled on every run instead.
         :param template_file_path:  Path to jinja2 template
         :type template_file_path: str
+        :param template_source: Source of the template at template_file_path, if it has already been read. The template
+            is then loaded from this source rather than read from disk again. Any templates it includes, imports or
+            extends are still loaded from the template's directory.
+        :type template_source: str | None
+        :param bytecode_cache_dir: Directory to store compiled template bytecode in. Created if it does not exist.
+            Defaults to ~/.cache/pymsgraph/jinja
+        :type bytecode_cache_dir: str | None
+        :param render_cache_size: Number of distinct rendered templates render_row keeps in memory. Set to 0 to render
+            the template fresh for every row (see render_row).
+        :type render_cache_size: int
+        :raises FileNotFoundError: If no template exists at template_file_path
         """
         logger.debug("Initializing Jinja2 Environment Extended ⏳")
         template_path: str
@@ -27,10 +59,44 @@ class JinjaFileSystemEnvironmentExtended(Environment):
         template_path, template_filename = self.split_template_path_and_filename(template_file_path)
         logger.debug(f"Template path: {template_path}")
         logger.debug(f"Template filename: {template_filename}")
-        super().__init__(loader=FileSystemLoader(template_path))
+        if bytecode_cache_dir is None:
+            bytecode_cache_dir = os.path.expanduser("~/.cache/pymsgraph/jinja")
+        bytecode_cache: FileSystemBytecodeCache | None = None
+        try:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            if not os.access(bytecode_cache_dir, os.W_OK):
+                raise PermissionError(f"Directory '{bytecode_cache_dir}' is not writable")
+            bytecode_cache = FileSystemBytecodeCache(directory=bytecode_cache_dir, pattern="%s.cache")
+            logger.debug(f"Template bytecode cache directory: {bytecode_cache_dir}")
+        except OSError as err:
+            logger.warning(f"Unable to use template bytecode cache directory ({err}). Continuing without it.⚠️")
+        # The template is loaded once and reused for every render, so never evict it from the cache or re-stat the
+        # source file for changes.
+        loader: FileSystemLoader | ChoiceLoader = FileSystemLoader(template_path)
+        if template_source is not None:
+            loader = ChoiceLoader([DictLoader({template_filename: template_source}), loader])
+        super().__init__(
+            loader=loader,
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+            cache_size=-1,
+        )
         logger.debug("Initialized Jinja2 Environment with FileSystemLoader✅")
-        self.template: Template = self.get_jinja2_template(template_filename)
+        try:
+            self.template: Template = self.get_jinja2_template(template_filename)
+        except TemplateNotFound as err:
+            raise FileNotFoundError(f"Template path '{template_file_path}' does not exist.") from err
         logger.debug("Loaded Jinja2 template ✅")
+        self.template_variables: tuple[str, ...] | None = self.get_template_variables(template_filename)
+        logger.debug(f"Template variables: {self.template_variables}")
+        self._render_cached = lru_cache(maxsize=render_cache_size)(self._render_context)
+        # A template that references no variables renders the same for every row (unless it is not deterministic, see
+        # render_row), so it is rendered once up front
+        self.constant_body: str | None = (
+            self.template.render() if self.template_variables == () and render_cache_size != 0 else None
+        )
+        if self.constant_body is not None:
+            logger.debug("Template does not reference any variables. Rendered it once for all rows.")
         logger.debug(f"Finished initializing Jinja2 Environment Extended ✅")
 
     @staticmethod
@@ -44,25 +110,8 @@ class JinjaFileSystemEnvironmentExtended(Environment):
         :return: Template directory path and filename
         :rtype: tuple[str, str]
         """
-        logger.trace(f"Entered function with template_file_path: {template_file_path}")
-        # Handle both linux and windows paths, by matching on the slash type
-        if "/" in template_file_path:
-            path_delimiter: str = "/"
-            logger.trace(f"Detected linux path type")
-        else:
-            path_delimiter: str = "\\"
-            logger.trace(f"Detected windows path type")
-        # Split the path by slash
-        path_arr: list[str] = template_file_path.split(path_delimiter)
-        logger.trace(f"Split path into array: {path_arr}")
-        # The filename for the template is the last index of the split path
-        # Pop the filename off of the list, this will remove the filename from the list
-        template_filename: str = path_arr.pop(len(path_arr) - 1)
-        logger.trace(f"Calculated filename to be {template_filename}")
-        # Join the path together
-        template_dir_path: str = f"{path_delimiter.join(path_arr)}{path_delimiter}"
-        logger.trace(f"Calculated template directory to be {template_dir_path}")
-        return template_dir_path, template_filename
+        absolute_template_file_path: str = os.path.abspath(template_file_path)
+        return os.path.dirname(absolute_template_file_path) + os.sep, os.path.basename(absolute_template_file_path)
 
     def get_jinja2_template(self, template_filename: str) -> Template:
         """
@@ -74,3 +123,46 @@ class JinjaFileSystemEnvironmentExtended(Environment):
         """
         logger.trace(f"Entered function with template_filename: {template_filename}")
         return self.get_template(name=template_filename)
+
+    def get_template_variables(self, template_filename: str) -> tuple[str, ...] | None:
+        """
+        Given the template filename, return the names of the variables the template references. Returns None if the
+        template includes, imports or extends other templates, as the variables those templates reference are unknown.
+
+        Note this parses the template source on every run, even when its compiled bytecode is already in the bytecode
+        cache, as the bytecode does not record which variables the template references. Parsing a single template is
+        a one-off cost per run, which is small next to rendering and sending an email per row.
+        :param template_filename: Filename of jinja2 template
+        :type template_filename: str
+        :return: Sorted variable names referenced by the template, or None
+        :rtype: tuple[str, ...] | None
+        """
+        logger.trace(f"Entered function with template_filename: {template_filename}")
+        template_source: str = self.loader.get_source(self, template_filename)[0]
+        template_ast = self.parse(template_source)
+        if any(True for _ in meta.find_referenced_templates(template_ast)):
+            logger.debug("Template references other templates. Cannot determine the variables it uses.")
+            return None
+        return tuple(sorted(meta.find_undeclared_variables(template_ast)))
+
+    def render_row(self, row: dict[str, str]) -> str:
+        """
+        Render the template with the provided row of data. Rows that share the same values for every variable the
+        template references render to the same string, so the rendered template is cached and reused for them.
+
+        This assumes the template is deterministic. A template whose output changes between renders with the same data
+        (for example using the random filter, a cycler, or the current time) would render once and have that output
+        reused for every matching row. For such templates, set render_cache_size to 0 so every row is rendered fresh.
+        :param row: Data to render the template with
+        :type row: dict[str, str]
+        :return: Rendered template
+        :rtype: str
+        """
+        if self.constant_body is not None:
+            return self.constant_body
+        if self.template_variables is None:
+            return self._render_cached(tuple(row.items()))
+        return self._render_cached(tuple((key, row[key]) for key in self.template_variables if key in row))
+
+    def _render_context(self, context: tuple[tuple[str, str], ...]) -> str:
+        return self.template.render(dict(context))
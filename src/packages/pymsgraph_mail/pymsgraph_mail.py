@@ -17,20 +17,44 @@ import logging
 import mimetypes
 
 # Modules for SimpleSendMail
+import random
 import sys
+import threading
 import time
 
+# Modules for BatchingSendMail
+from collections import deque
+from concurrent.futures import Future
+
 # Modules for EmailImportance
 from enum import Enum
 from functools import wraps
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+
+# Maximum number of requests MS Graph accepts in a single JSON batch request
+MSGRAPH_MAX_BATCH_SIZE: int = 20
+
+# HTTP status codes returned by MS Graph for transient errors, which are retried with exponential backoff
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({408, 429, 500, 502, 503, 504})
+# Initial and maximum number of seconds to wait between retries, when MS Graph does not provide a Retry-After header
+RETRY_BACKOFF_INITIAL: float = 0.5
+RETRY_BACKOFF_MAX: float = 30
 
 
 class MsGraphRateLimitExceededError(Exception):
-    def __init__(self, message: str, retry_after: int = 90):
+    def __init__(self, message: str, retry_after: int | None = None):
+        super().__init__(message)
+        self.retry_after: int | None = retry_after
+
+
+class MsGraphBatchRequestError(Exception):
+    def __init__(self, message: str, status_code: int):
         super().__init__(message)
-        self.retry_after: int = retry_after
+        self.status_code: int = status_code
 
 
 class EmailImportance(str, Enum):
@@ -159,6 +183,8 @@ class SimpleSendMail:
         verbose: bool = False,
         log_mail_payloads: bool = False,
         max_retries: int = 5,
+        max_connections: int = 10,
+        request_timeout: tuple[float, float] = (10, 60),
     ):
         """Initalizes the SimpleSendMail class.
 
@@ -182,6 +208,14 @@ class SimpleSendMail:
             console using a basic logging configuration, if logger did not
             already have console logging enabled. Defaults to False.
 
+            max_connections (int, optional): Number of pooled keep-alive
+            connections to keep open to each host. Set this to the number of
+            threads that will call the class concurrently. Defaults to 10.
+
+            request_timeout (tuple[float, float], optional): Number of seconds
+            to wait for a connection to MS Graph to open, and for MS Graph to
+            respond, before a request fails. Defaults to (10, 60).
+
         Raises:
             TypeError: Will raise a type error if a provided parameter is not
             the proper type
@@ -192,6 +226,7 @@ class SimpleSendMail:
         self._logger: logging.Logger = logging.getLogger(__name__)
         self._max_retries: int = max_retries
         self._log_mail_payloads: bool = log_mail_payloads
+        self._request_timeout: tuple[float, float] = request_timeout
 
         # If verbose was provided
         if verbose:
@@ -303,6 +338,22 @@ class SimpleSendMail:
         self._source_mail_name: str = source_mail_name
         self._source_mail_address: str = source_mail_address
 
+        # Create a single HTTP session shared by every request (and every thread) made through this class, so the
+        # TCP + TLS connection to MS Graph is kept alive and reused rather than re-established for each email.
+        # The adapter does not retry anything itself (Retry(total=0)); transient errors are retried by retry_request,
+        # so that there is only one layer of retries.
+        self._session: requests.Session = requests.Session()
+        http_adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=max_connections,
+            pool_maxsize=max_connections,
+            max_retries=Retry(total=0, read=False, raise_on_status=False),
+        )
+        self._session.mount("https://", http_adapter)
+        self._logger.debug(f"Created HTTP session with a connection pool size of {max_connections}")
+
+        # Used to make sure only one thread refreshes the OAuth token when it is about to expire
+        self._token_lock: threading.Lock = threading.Lock()
+
         # Initalize oauth_token_info: dict class field by retrieving OAuth token from MSFT
         self.__oauth_token_info: dict[str] = self.__get_OAuth_token()
         self._logger.info("Finished initalizing SimpleSendMail class.")
@@ -336,7 +387,7 @@ class SimpleSendMail:
 
         try:
             # Send post to get oauth token
-            response = requests.post(url=oauth_url, data=oauth_body)
+            response = self._session.post(url=oauth_url, data=oauth_body, timeout=self._request_timeout)
             # Used to raise an exception if status code of response is non-200 (2xx)
             response.raise_for_status()
 
@@ -363,7 +414,8 @@ class SimpleSendMail:
 
     def check_token_validity(func):
         """Wrapper function to check if OAuth token is, or will expire soon
-        (5 second buffer) and refresh it with a new one if so.
+        (60 second buffer) and refresh it with a new one if so. Only one
+        thread refreshes the token, other threads wait and reuse it.
 
         Args:
             func (_type_): The function the wrapper decorates
@@ -374,12 +426,15 @@ class SimpleSendMail:
 
         @wraps(func)
         def check_token_expiration(self, *args, **kwargs):
-            # Check if the current seconds timestamp + 5 seconds buffer is greater than the expires_at time.
-            if int(time.time() + 5) >= self.__oauth_token_info["expires_at"]:
-                self._logger.warning(
-                    f"OAuth token is expiring soon at {time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(self.__oauth_token_info['expires_at']))}, retrieving new token"
-                )
-                self.__oauth_token_info = self.__get_OAuth_token()
+            # Check if the current seconds timestamp + 60 seconds buffer is greater than the expires_at time.
+            if int(time.time() + 60) >= self.__oauth_token_info["expires_at"]:
+                with self._token_lock:
+                    # Check again now that the lock is held, in case another thread already refreshed the token
+                    if int(time.time() + 60) >= self.__oauth_token_info["expires_at"]:
+                        self._logger.warning(
+                            f"OAuth token is expiring soon at {time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(self.__oauth_token_info['expires_at']))}, retrieving new token"
+                        )
+                        self.__oauth_token_info = self.__get_OAuth_token()
             else:
                 self._logger.debug("Token not expiring soon.. continuing")
             return func(self, *args, **kwargs)
@@ -387,21 +442,47 @@ class SimpleSendMail:
         return check_token_expiration
 
     def retry_request(func):
+        """Wrapper function to retry a request that failed due to a transient
+        error: MS Graph throttling (429), a transient HTTP status code (408,
+        500, 502, 503, 504), or a failure to connect to MS Graph. Waits for
+        the Retry-After period if MS Graph provided one, otherwise backs off
+        exponentially with jitter. Retries up to max_retries times.
+
+        Connection errors after the connection was opened (such as the
+        connection being reset, or a read timeout) are not retried, as MS
+        Graph may have already received the request, and resending it could
+        send the same emails twice.
+
+        Args:
+            func (_type_): The function the wrapper decorates
+
+        Returns:
+            func (_type_): The function the wrapper decorates
+        """
+
         @wraps(func)
         def wrapper(self, *args, **kwargs):
             req_attempt: int = 0
+            last_error: Exception | None = None
             while req_attempt < self._max_retries:
                 try:
                     self._logger.debug(f"Retry Counter: {req_attempt}/{self._max_retries}")
                     return func(self, *args, **kwargs)
-                except MsGraphRateLimitExceededError as error:
+                except (MsGraphRateLimitExceededError, requests.exceptions.RequestException) as error:
+                    retry_delay: float | None = self._get_error_retry_delay(error, req_attempt)
+                    if retry_delay is None:
+                        raise error
                     self._logger.warning(
-                        "MSGraph rate limit was exceeded." + f" Retrying in {error.retry_after} seconds..."
+                        f"Request to MSGraph API failed ({error}). Retrying in {retry_delay:.2f} seconds..."
                     )
                     # Enable for testing max retries
                     # time.sleep(1)
-                    time.sleep(error.retry_after)
+                    time.sleep(retry_delay)
+                    last_error = error
                     req_attempt += 1
+            if last_error is not None and not isinstance(last_error, MsGraphRateLimitExceededError):
+                self._logger.warning("Max retries was reached, raising last error to calling function.")
+                raise last_error
             self._logger.warning(
                 "Max retries was reached, raising " + "MsGraphRateLimitExceededError to calling function."
             )
@@ -414,9 +495,70 @@ class SimpleSendMail:
 
         return wrapper
 
-    @retry_request
-    @check_token_validity
-    def send_mail(
+    def _get_error_retry_delay(self, error: Exception, req_attempt: int) -> float | None:
+        """Work out whether a failed request should be retried, and if so how
+        long to wait before retrying it. Shared by retry_request and
+        send_mail_batch, so both retry the same errors.
+
+        Args:
+            error (Exception): Error raised by the request
+
+            req_attempt (int): Number of attempts made so far
+
+        Returns:
+            float | None: Number of seconds to wait before retrying, or None
+            if the request should not be retried
+        """
+        if isinstance(error, MsGraphRateLimitExceededError):
+            return self._get_retry_delay(req_attempt, error.retry_after)
+        if isinstance(error, requests.exceptions.HTTPError):
+            if error.response is None or error.response.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            return self._get_retry_delay(req_attempt, error.response.headers.get("Retry-After"))
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return self._get_retry_delay(req_attempt) if self._failed_before_sending(error) else None
+        return None
+
+    @staticmethod
+    def _failed_before_sending(error: requests.exceptions.RequestException) -> bool:
+        """Check whether a request failed before any of it was sent to MS
+        Graph, because the connection could not be opened (or timed out
+        while opening). Only then is it certain that resending the request
+        will not repeat it.
+
+        Args:
+            error (requests.exceptions.RequestException): Error raised by the
+            request
+
+        Returns:
+            bool: True if the connection to MS Graph could not be opened
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        # requests wraps the underlying urllib3 error, whose reason is NewConnectionError if the connection failed
+        return len(error.args) > 0 and isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+
+    @staticmethod
+    def _get_retry_delay(req_attempt: int, retry_after: str | int | None = None) -> float:
+        """Calculate how long to wait before retrying a request. Uses the
+        Retry-After value provided by MS Graph if present, otherwise an
+        exponential backoff (capped at 30 seconds) plus up to 1 second of
+        random jitter, so that concurrent retries do not all fire at once.
+
+        Args:
+            req_attempt (int): Number of attempts made so far
+
+            retry_after (str | int | None, optional): Value of the Retry-After
+            header, if provided. Defaults to None.
+
+        Returns:
+            float: Number of seconds to wait
+        """
+        if retry_after is not None:
+            return float(retry_after)
+        return min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_INITIAL * 2**req_attempt) + random.uniform(0, 1)
+
+    def _build_mail_payload(
         self,
         subject: str,
         recipient_emails: str | list[str],
@@ -427,18 +569,13 @@ class SimpleSendMail:
         saveToSentItems: bool = True,
         cc_recipient_emails: list[str] | None = None,
         bcc_recipient_emails: list[str] | None = None,
-    ):
-        self._logger.info(f"Sending email_details from {self._source_mail_address} to {recipient_emails}")
-        self._logger.debug(f"Sending email_details with the following provided parameters: {locals()}")
-
-        mail_url: str = f"https://graph.microsoft.com/v1.0/users/{self._source_mail_address}/sendMail"
-        self._logger.debug(f"Constructed mail url {mail_url}")
-
-        headers: dict[str] = {
-            "Authorization": f"{self.__oauth_token_info['token_type']} {self.__oauth_token_info['access_token']}",
-            "Content-Type": "application/json",
-        }
+    ) -> dict:
+        """Construct the sendMail JSON payload for a single email. Used by
+        both send_mail and send_mail_batch.
 
+        Returns:
+            dict: The sendMail request body
+        """
         # Construct the baseline mail payload
         mail_playload: dict = {
             "message": {
@@ -524,13 +661,56 @@ class SimpleSendMail:
                 mail_playload["message"]["attachments"].append(dict(attachments))
                 self._logger.debug(f"Added single attachment: {str(attachments)}")
 
+        return mail_playload
+
+    @retry_request
+    @check_token_validity
+    def send_mail(
+        self,
+        subject: str,
+        recipient_emails: str | list[str],
+        body_content: str,
+        body_type: BodyType = BodyType.Text,
+        importance: EmailImportance = EmailImportance.Low,
+        attachments: SimpleFileAttachment | list[SimpleFileAttachment] | None = None,
+        saveToSentItems: bool = True,
+        cc_recipient_emails: list[str] | None = None,
+        bcc_recipient_emails: list[str] | None = None,
+    ):
+        self._logger.info(f"Sending email_details from {self._source_mail_address} to {recipient_emails}")
+        # Passed as an argument so the parameters (including the whole email body) are only formatted if debug logging
+        # is enabled
+        self._logger.debug("Sending email_details with the following provided parameters: %s", locals())
+
+        mail_url: str = f"https://graph.microsoft.com/v1.0/users/{self._source_mail_address}/sendMail"
+        self._logger.debug(f"Constructed mail url {mail_url}")
+
+        headers: dict[str] = {
+            "Authorization": f"{self.__oauth_token_info['token_type']} {self.__oauth_token_info['access_token']}",
+            "Content-Type": "application/json",
+        }
+
+        mail_playload: dict = self._build_mail_payload(
+            subject=subject,
+            recipient_emails=recipient_emails,
+            body_content=body_content,
+            body_type=body_type,
+            importance=importance,
+            attachments=attachments,
+            saveToSentItems=saveToSentItems,
+            cc_recipient_emails=cc_recipient_emails,
+            bcc_recipient_emails=bcc_recipient_emails,
+        )
+
         if self._log_mail_payloads:
             self._logger.debug(f"Prepared mail body: {json.dumps(mail_playload,indent=4)}")
 
         try:
             self._logger.debug("Trying to send mail via MS Graph API")
             # Sending a post request to MS Graph API
-            response = requests.post(url=mail_url, headers=headers, json=mail_playload)
+            response = self._session.post(
+                url=mail_url, headers=headers, json=mail_playload, timeout=self._request_timeout
+            )
             # Checks the status code of response, raises HTTPError if non-2XX
             response.raise_for_status()
             self._logger.info(f"Successfully sent email_details from {self._source_mail_address} to {recipient_emails}")
@@ -545,22 +725,134 @@ class SimpleSendMail:
                     + f"{str(recipient_emails)}. Raising MsGraphRateLimitExceededError..."
                 )
                 # Raise an instance of MsGraphRateLimitExceededError
-                # Which includes the int value from the Retry-After header
-                # Which will be used in the wrapper's time.sleep() call
+                # Which includes the int value from the Retry-After header (if provided)
+                # Which will be used to work out the wrapper's time.sleep() call
+                retry_after: str | None = response.headers.get("Retry-After")
                 raise MsGraphRateLimitExceededError(
                     message=str(http_err),
-                    retry_after=int(response.headers["Retry-After"]),
+                    retry_after=int(retry_after) if retry_after is not None else None,
                 )
             # If the status code was not 429, but something else, raise it
             else:
                 self._logger.exception(http_err)
                 raise http_err
         except requests.exceptions.RequestException as e:
-            self._logger.debug(response.text)
             self._logger.exception(f"An error occurred while attempting to send an email_details to {recipient_emails}")
             self._logger.exception(e)
             raise e
 
+    def send_mail_batch(self, mails: list[dict]) -> list[dict]:
+        """Send up to 20 emails in a single request to the MS Graph JSON batch
+        endpoint, rather than one request per email. Emails within the batch
+        that fail with a transient error (such as throttling) are resent after
+        waiting for their Retry-After period, or an exponential backoff if
+        none was provided. The whole batch request is retried in the same way
+        if it fails with an error retry_request would retry. At most
+        max_retries batch requests are made in total.
+
+        Args:
+            mails (list[dict]): One dictionary per email, containing the
+            keyword arguments that would otherwise be passed to send_mail.
+
+        Raises:
+            ValueError: Will raise a ValueError if more than 20 emails are
+            provided
+
+        Returns:
+            list[dict]: The batch response for each email (containing its
+            'status', 'headers' and 'body'), in the same order as mails.
+        """
+        if len(mails) > MSGRAPH_MAX_BATCH_SIZE:
+            self._logger.exception(f"{len(mails)} emails were provided to send_mail_batch. Raising exception.")
+            raise ValueError(f"send_mail_batch accepts at most {MSGRAPH_MAX_BATCH_SIZE} emails, not {len(mails)}")
+
+        self._logger.info(f"Sending batch of {len(mails)} emails from {self._source_mail_address}")
+        batch_requests: list[dict] = [
+            {
+                "id": str(i),
+                "method": "POST",
+                "url": f"/users/{self._source_mail_address}/sendMail",
+                "body": self._build_mail_payload(**mail),
+                "headers": {"Content-Type": "application/json"},
+            }
+            for i, mail in enumerate(mails)
+        ]
+
+        batch_responses: dict[str, dict] = {}
+        pending_requests: list[dict] = batch_requests
+        req_attempt: int = 0
+        # This loop is the only retry layer for batch requests (_post_batch is not wrapped in retry_request), so that
+        # failures of the whole batch and of emails within it share one attempt counter
+        while True:
+            try:
+                pending_responses: list[dict] = self._post_batch(pending_requests)
+            except (MsGraphRateLimitExceededError, requests.exceptions.RequestException) as error:
+                batch_retry_delay: float | None = self._get_error_retry_delay(error, req_attempt)
+                req_attempt += 1
+                if batch_retry_delay is None or req_attempt >= self._max_retries:
+                    raise error
+                self._logger.warning(
+                    f"Batch request to MSGraph API failed ({error}). Retrying in {batch_retry_delay:.2f} seconds..."
+                )
+                time.sleep(batch_retry_delay)
+                continue
+
+            retry_delay: float = 0
+            retry_ids: set[str] = set()
+            for batch_response in pending_responses:
+                batch_responses[batch_response["id"]] = batch_response
+                if batch_response["status"] in RETRYABLE_STATUS_CODES:
+                    retry_ids.add(batch_response["id"])
+                    retry_after: str | None = (batch_response.get("headers") or {}).get("Retry-After")
+                    retry_delay = max(retry_delay, self._get_retry_delay(req_attempt, retry_after))
+
+            req_attempt += 1
+            if len(retry_ids) == 0 or req_attempt >= self._max_retries:
+                break
+
+            self._logger.warning(
+                f"MSGraph API returned a transient error for {len(retry_ids)} emails in batch."
+                + f" Retrying them in {retry_delay:.2f} seconds..."
+            )
+            time.sleep(retry_delay)
+            pending_requests = [request for request in batch_requests if request["id"] in retry_ids]
+
+        return [batch_responses[request["id"]] for request in batch_requests]
+
+    @check_token_validity
+    def _post_batch(self, batch_requests: list[dict]) -> list[dict]:
+        batch_url: str = "https://graph.microsoft.com/v1.0/$batch"
+        headers: dict[str] = {
+            "Authorization": f"{self.__oauth_token_info['token_type']} {self.__oauth_token_info['access_token']}",
+            "Content-Type": "application/json",
+        }
+
+        try:
+            self._logger.debug(f"Sending batch of {len(batch_requests)} requests to {batch_url}")
+            response = self._session.post(
+                url=batch_url, headers=headers, json={"requests": batch_requests}, timeout=self._request_timeout
+            )
+            response.raise_for_status()
+            return response.json()["responses"]
+        except requests.exceptions.HTTPError as http_err:
+            if response.status_code == 429:
+                self._logger.warning(response.text)
+                self._logger.warning(
+                    "Rate limit was exceeded when sending batch. Raising MsGraphRateLimitExceededError..."
+                )
+                retry_after: str | None = response.headers.get("Retry-After")
+                raise MsGraphRateLimitExceededError(
+                    message=str(http_err),
+                    retry_after=int(retry_after) if retry_after is not None else None,
+                )
+            else:
+                self._logger.exception(http_err)
+                raise http_err
+        except requests.exceptions.RequestException as e:
+            self._logger.exception(f"An error occurred while attempting to send a batch request to {batch_url}")
+            self._logger.exception(e)
+            raise e
+
     @retry_request
     @check_token_validity
     def _get_mail_folder(self, folder_name: str, user_principal_name: str) -> dict:
@@ -581,7 +873,7 @@ class SimpleSendMail:
         self._logger.debug(f"Sending get request to {request_url}")
 
         try:
-            response = requests.get(url=request_url)
+            response = self._session.get(url=request_url, timeout=self._request_timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as err:
@@ -673,7 +965,7 @@ class SimpleSendMail:
             # Empty list for returned messages
             messages: list[dict] = []
             # Make inital request for messages
-            response = requests.get(url=request_url, params=params, headers=headers)
+            response = self._session.get(url=request_url, params=params, headers=headers, timeout=self._request_timeout)
             response.raise_for_status()
 
             self._logger.debug(f"API returned {len(response.json().get('value'))} messages.")
@@ -737,7 +1029,7 @@ class SimpleSendMail:
         self._logger.debug(f"Defined request URL: {request_url}")
 
         try:
-            response = requests.delete(url=request_url, headers=headers)
+            response = self._session.delete(url=request_url, headers=headers, timeout=self._request_timeout)
             response.raise_for_status()
             self._logger.info(f"Successfully deleted message id {message_id} from mailbox of {user_principal_name}")
         except requests.exceptions.HTTPError as err:
@@ -768,3 +1060,121 @@ class SimpleSendMail:
             )
             self._logger.exception(err)
             raise (err)
+
+
+class BatchingSendMail:
+    def __init__(
+        self,
+        simple_mail: SimpleSendMail,
+        max_batch_size: int = MSGRAPH_MAX_BATCH_SIZE,
+        max_wait: float = 0.5,
+    ):
+        """Buffers emails sent through send_mail and sends them to MS Graph in
+        batches using SimpleSendMail.send_mail_batch. A batch is sent once
+        max_batch_size emails are buffered, or max_wait seconds have passed
+        since the last batch was sent.
+
+        Args:
+            simple_mail (SimpleSendMail): Initalized SimpleSendMail instance
+            used to send each batch
+
+            max_batch_size (int, optional): Number of emails to buffer before
+            sending a batch. Must be between 1 and 20. Defaults to 20.
+
+            max_wait (float, optional): Maximum number of seconds an email
+            waits in the buffer before it is sent. Defaults to 0.5.
+
+        Raises:
+            ValueError: Will raise a ValueError if max_batch_size is not
+            between 1 and 20
+        """
+        self._logger: logging.Logger = logging.getLogger(__name__)
+
+        if not 1 <= max_batch_size <= MSGRAPH_MAX_BATCH_SIZE:
+            self._logger.exception(f"max_batch_size of {max_batch_size} is out of range. Raising exception.")
+            raise ValueError(f"max_batch_size must be between 1 and {MSGRAPH_MAX_BATCH_SIZE}, not {max_batch_size}")
+
+        self._simple_mail: SimpleSendMail = simple_mail
+        self._max_batch_size: int = max_batch_size
+        self._max_wait: float = max_wait
+        self._buffer: deque[tuple[dict, Future]] = deque()
+        self._buffer_lock: threading.Lock = threading.Lock()
+        self._last_flush: float = time.monotonic()
+
+        # Background thread that sends partially filled batches once max_wait has passed
+        self._closed: threading.Event = threading.Event()
+        self._flush_thread: threading.Thread = threading.Thread(target=self.__flush_periodically, daemon=True)
+        self._flush_thread.start()
+        self._logger.debug(
+            f"Initalized BatchingSendMail with max_batch_size={max_batch_size} and max_wait={max_wait} seconds."
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send_mail(self, **kwargs) -> Future:
+        """Add an email to the buffer, to be sent with the next batch.
+
+        Args:
+            **kwargs: Keyword arguments accepted by SimpleSendMail.send_mail
+
+        Returns:
+            Future: Resolves to None once the email is sent, or raises the
+            error that caused it to fail.
+        """
+        future: Future = Future()
+        with self._buffer_lock:
+            self._buffer.append((kwargs, future))
+            is_batch_full: bool = len(self._buffer) >= self._max_batch_size
+        if is_batch_full:
+            self.flush()
+        return future
+
+    def flush(self) -> None:
+        """Send up to max_batch_size buffered emails as a single batch, and
+        resolve the future of each one."""
+        with self._buffer_lock:
+            batch: list[tuple[dict, Future]] = [
+                self._buffer.popleft() for _ in range(min(len(self._buffer), self._max_batch_size))
+            ]
+            self._last_flush = time.monotonic()
+        if len(batch) == 0:
+            return
+
+        try:
+            batch_responses: list[dict] = self._simple_mail.send_mail_batch([mail for mail, _ in batch])
+        except Exception as err:
+            for _, future in batch:
+                future.set_exception(err)
+            return
+
+        for (mail, future), batch_response in zip(batch, batch_responses):
+            if 200 <= batch_response["status"] < 300:
+                future.set_result(None)
+            else:
+                error_message: str = (batch_response.get("body") or {}).get("error", {}).get("message", "")
+                self._logger.error(
+                    f"Failed to send email to {mail.get('recipient_emails')} - status code {batch_response['status']}"
+                )
+                future.set_exception(
+                    MsGraphBatchRequestError(
+                        message=f"MSGraph API returned a status code of {batch_response['status']}: {error_message}",
+                        status_code=batch_response["status"],
+                    )
+                )
+
+    def close(self) -> None:
+        """Stop the background flush thread and send any emails left in the
+        buffer."""
+        self._closed.set()
+        self._flush_thread.join()
+        while len(self._buffer) > 0:
+            self.flush()
+
+    def __flush_periodically(self) -> None:
+        while not self._closed.wait(self._max_wait):
+            if len(self._buffer) > 0 and time.monotonic() - self._last_flush >= self._max_wait:
+                self.flush()